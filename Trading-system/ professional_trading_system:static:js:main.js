@@ -274,15 +274,16 @@ class ProfessionalTradingSystem {
     }
 
     renderChart() {
-        const data = this.data.market[this.selectedSymbol] || [];
-        if (!data.length) return;
+        // Candles arrive as columns: {t, o, h, l, c, v}
+        const data = this.data.market[this.selectedSymbol];
+        if (!data || !data.c.length) return;
 
         const trace = [{
-            x: data.map(d => d.time),
-            open: data.map(d => d.open),
-            high: data.map(d => d.high),
-            low: data.map(d => d.low),
-            close: data.map(d => d.close),
+            x: data.t,
+            open: data.o,
+            high: data.h,
+            low: data.l,
+            close: data.c,
             type: 'candlestick',
             increasing: { line: { color: '#4ade80' } },
             decreasing: { line: { color: '#f87171' } },
@@ -299,11 +300,11 @@ class ProfessionalTradingSystem {
         };
 
         Plotly.newPlot(this.chartId, trace, layout, { displayModeBar: false, responsive: true });
-        const last = data[data.length - 1];
-        document.querySelector('.live-price')?.textContent = `$${(last.close ?? 0).toFixed(2)}`;
+        const lastClose = data.c[data.c.length - 1];
+        document.querySelector('.live-price')?.textContent = `$${(lastClose ?? 0).toFixed(2)}`;
         const changeEl = document.querySelector('.live-change');
         if (changeEl) {
-            const change = ((last.close - data[0].open) / data[0].open) * 100;
+            const change = ((lastClose - data.o[0]) / data.o[0]) * 100;
             changeEl.textContent = `${change >= 0 ? '+' : ''}${change.toFixed(2)}%`;
             changeEl.classList.toggle('positive', change >= 0);
             changeEl.classList.toggle('negative', change < 0);
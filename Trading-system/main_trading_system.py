@@ -1,12 +1,15 @@
 import asyncio
 import logging
 import time
-from datetime import datetime
-from typing import Dict
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 import json
 import sqlite3
-from market_data.api_connector import MarketAPI
+from market_data.api_connector import AsyncMarketAPI
 from market_data.data_fetcher import DataFetcher
+from market_data.market_stream import MarketStream
 from trading_engine.signal_generator import SignalGenerator
 from trading_engine.risk_manager import RiskManager
 from telegram_bot.bot import TradingSignalBot
@@ -18,116 +21,217 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_INSERT_SIGNAL_SQL = '''
+    INSERT INTO signals (
+        symbol, signal_type, timeframe, entry_price, stop_loss, take_profit,
+        position_size, risk_percent, rsi, volume_ratio, trend
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_TRADE_SQL = '''
+    INSERT INTO trades (
+        symbol, timeframe, signal_type, entry_price, stop_loss, take_profit,
+        position_size, risk_amount, profit_potential, capital_before, capital_after, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 class TradingSystem:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Mapping):
         self.config = config
-        self.api_connector = MarketAPI(config.get('exchange', 'binance'))
+        self.api_connector = AsyncMarketAPI(config.get('exchange', 'binance'))
         self.data_fetcher = DataFetcher(self.api_connector)
         self.signal_generator = SignalGenerator(config)
         self.risk_manager = RiskManager(config)
         self.telegram_bot = TradingSignalBot()
         
         # Initialize database
-        self.db_connection = sqlite3.connect('trading_system.db', check_same_thread=False)
+        # Autocommit mode: transactions are opened explicitly via self.transaction()
+        self.db_connection = sqlite3.connect('trading_system.db', check_same_thread=False, isolation_level=None)
+        # One long-lived cursor; the connection's statement cache keeps the INSERTs prepared
+        self._cursor = self.db_connection.cursor()
         self.init_database()
 
+        # Rows buffered by save_trade_to_db, written once per cycle by flush_db
+        self._pending_signals = []
+        self._pending_trades = []
+
         # Trading symbols to monitor
         self.symbols = config.get('symbols', ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])
         self.timeframes = config.get('timeframes') or [config.get('timeframe', '1h')]
+        self._trading_windows = self.parse_trading_hours(config.get('trading_hours'))
+
+        # Bounds concurrent exchange requests across symbol/timeframe tasks (backfill and refresh),
+        # by default to what the exchange's rate limit allows per second
+        max_concurrent = config.get('max_concurrent_requests') or self.api_connector.requests_per_second()
+        self._request_semaphore = asyncio.Semaphore(max_concurrent)
     
     def init_database(self):
         """Initialize the database"""
-        cursor = self.db_connection.cursor()
+        cursor = self._cursor
+
+        # PRAGMAs must run outside a transaction, so set them before any DDL.
+        # WAL lets the dashboard read while the trading loop writes.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                symbol TEXT,
-                timeframe TEXT,
-                signal_type TEXT,
-                entry_price REAL,
-                stop_loss REAL,
-                take_profit REAL,
-                position_size REAL,
-                risk_amount REAL,
-                profit_potential REAL,
-                capital_before REAL,
-                capital_after REAL,
-                status TEXT DEFAULT 'OPEN'
-            )
-        ''')
+        with self.transaction():
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    symbol TEXT,
+                    timeframe TEXT,
+                    signal_type TEXT,
+                    entry_price REAL,
+                    stop_loss REAL,
+                    take_profit REAL,
+                    position_size REAL,
+                    risk_amount REAL,
+                    profit_potential REAL,
+                    capital_before REAL,
+                    capital_after REAL,
+                    status TEXT DEFAULT 'OPEN'
+                )
+            ''')
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS signals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                symbol TEXT,
-                timeframe TEXT,
-                signal_type TEXT,
-                entry_price REAL,
-                stop_loss REAL,
-                take_profit REAL,
-                position_size REAL,
-                risk_percent REAL,
-                rsi REAL,
-                volume_ratio REAL,
-                trend TEXT
-            )
-        ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS signals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    symbol TEXT,
+                    timeframe TEXT,
+                    signal_type TEXT,
+                    entry_price REAL,
+                    stop_loss REAL,
+                    take_profit REAL,
+                    position_size REAL,
+                    risk_percent REAL,
+                    rsi REAL,
+                    volume_ratio REAL,
+                    trend TEXT
+                )
+            ''')
 
-        # Ensure timeframe columns exist for backward compatibility
-        try:
-            cursor.execute("ALTER TABLE trades ADD COLUMN timeframe TEXT")
-        except sqlite3.OperationalError:
-            pass
+            # Ensure timeframe columns exist for backward compatibility
+            for table in ('trades', 'signals'):
+                columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+                if 'timeframe' not in columns:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN timeframe TEXT")
 
-        try:
-            cursor.execute("ALTER TABLE signals ADD COLUMN timeframe TEXT")
-        except sqlite3.OperationalError:
-            pass
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_trades_symbol_ts ON trades(symbol, timeframe, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_signals_symbol_ts ON signals(symbol, timestamp)")
+            # Dashboard queries: today's rows by time range, open positions newest first
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_signals_ts ON signals(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_trades_ts ON trades(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_trades_status_ts ON trades(status, timestamp DESC)")
 
-        self.db_connection.commit()
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in a single BEGIN IMMEDIATE ... COMMIT block"""
+        cursor = self._cursor
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
     
     async def run_trading_cycle(self):
         """Main trading cycle"""
         logger.info("Starting trading system...")
 
-        while True:
-            try:
-                if not self.is_within_trading_hours():
-                    logger.info("Outside trading hours. Waiting before next check.")
-                    await asyncio.sleep(self.config.get('off_hours_sleep', 300))
-                    continue
-
-                for symbol in self.symbols:
-                    for timeframe in self.timeframes:
-                        await self.analyze_symbol(symbol, timeframe)
+        try:
+            while True:
+                try:
+                    if not self.is_within_trading_hours():
+                        logger.info("Outside trading hours. Waiting before next check.")
+                        await asyncio.sleep(self.config.get('off_hours_sleep', 300))
+                        continue
+
+                    await asyncio.gather(*(
+                        self.analyze_symbol(symbol, timeframe)
+                        for symbol in self.symbols
+                        for timeframe in self.timeframes
+                    ))
+
+                    self.flush_db()
                 
-                # Check if daily target is reached
-                if self.risk_manager.should_stop_trading_today():
-                    logger.info("Daily target reached. Stopping trading for today.")
-                    await self.send_daily_report()
-                    # Wait until next trading day
-                    await asyncio.sleep(3600)  # Wait 1 hour before checking again
+                    # Check if daily target is reached
+                    if self.risk_manager.should_stop_trading_today():
+                        logger.info("Daily target reached. Stopping trading for today.")
+                        await self.send_daily_report()
+                        # Wait until next trading day
+                        await asyncio.sleep(3600)  # Wait 1 hour before checking again
                 
-                # Wait before next cycle
-                await asyncio.sleep(self.config.get('refresh_interval', 300))  # 5 minutes default
+                    # Wait before next cycle
+                    await asyncio.sleep(self.config.get('refresh_interval', 300))  # 5 minutes default
                 
-            except Exception as e:
-                logger.error(f"Error in trading cycle: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute before retrying
+                except Exception as e:
+                    logger.error("Error in trading cycle: %s", e)
+                    await asyncio.sleep(60)  # Wait 1 minute before retrying
+        finally:
+            await self.api_connector.close()
     
-    async def analyze_symbol(self, symbol: str, timeframe: str):
+    async def run_streaming_cycle(self):
+        """Event-driven trading cycle: REST backfill, then one analysis per closed candle"""
+        logger.info("Starting trading system (market stream)...")
+
+        stream = MarketStream(self.symbols, self.timeframes)
+        stream_task = asyncio.create_task(stream.run())
+
+        try:
+            # Cold start: load history over REST
+            await asyncio.gather(*(
+                self.analyze_symbol(symbol, timeframe)
+                for symbol in self.symbols
+                for timeframe in self.timeframes
+            ))
+            self.flush_db()
+
+            # Day on which the daily target was reached; candles are only cached until it ends
+            target_reached_on = None
+
+            while True:
+                symbol, timeframe, candle = await stream.queue.get()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Closed candle %s %s: %s", symbol, timeframe, candle)
+
+                try:
+                    # Keep the cache current even outside trading hours; a gap falls back to REST
+                    contiguous = self.api_connector.add_candle(symbol, timeframe, candle)
+
+                    if not self.is_within_trading_hours() or target_reached_on == date.today():
+                        continue
+
+                    await self.analyze_symbol(symbol, timeframe, refresh=not contiguous)
+                    self.flush_db()
+
+                    # Check if daily target is reached; no sleeping here, the queue must keep draining
+                    if self.risk_manager.should_stop_trading_today():
+                        logger.info("Daily target reached. Stopping trading for today.")
+                        await self.send_daily_report()
+                        target_reached_on = date.today()
+
+                except Exception as e:
+                    logger.error("Error in trading cycle: %s", e)
+        finally:
+            stream_task.cancel()
+            await self.api_connector.close()
+
+    async def analyze_symbol(self, symbol: str, timeframe: str, refresh: bool = True):
         """Analyze a single symbol"""
         try:
-            logger.info(f"Analyzing {symbol} on {timeframe} timeframe")
+            logger.info("Analyzing %s on %s timeframe", symbol, timeframe)
 
             # Fetch market data
-            market_data = self.data_fetcher.fetch_and_analyze(symbol, timeframe)
+            async with self._request_semaphore:
+                market_data = await self.data_fetcher.fetch_and_analyze(symbol, timeframe, refresh=refresh)
             
             if not market_data:
-                logger.warning(f"No data received for {symbol}")
+                logger.warning("No data received for %s", symbol)
                 return
             
             # Generate signals
@@ -141,7 +245,7 @@ class TradingSystem:
                 await self.execute_trade(signal)
         
         except Exception as e:
-            logger.error(f"Error analyzing {symbol}: {e}")
+            logger.error("Error analyzing %s: %s", symbol, e)
     
     async def execute_trade(self, signal: Dict):
         """Execute a trade based on signal"""
@@ -174,21 +278,14 @@ class TradingSystem:
             # Save to database
             self.save_trade_to_db(trade_signal)
             
-            logger.info(f"Trade executed for {signal['symbol']}: {trade_signal['signal_type']}")
+            logger.info("Trade executed for %s: %s", signal['symbol'], trade_signal['signal_type'])
             
         except Exception as e:
-            logger.error(f"Error executing trade: {e}")
+            logger.error("Error executing trade: %s", e)
     
     def save_trade_to_db(self, trade_signal: Dict):
-        """Save trade to database"""
-        cursor = self.db_connection.cursor()
-
-        cursor.execute('''
-            INSERT INTO signals (
-                symbol, signal_type, timeframe, entry_price, stop_loss, take_profit,
-                position_size, risk_percent, rsi, volume_ratio, trend
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Buffer trade for the next database flush"""
+        self._pending_signals.append((
             trade_signal['symbol'],
             trade_signal['signal_type'],
             trade_signal.get('timeframe', 'N/A'),
@@ -202,14 +299,7 @@ class TradingSystem:
             'N/A'  # Placeholder - would need to get from market data
         ))
 
-        cursor.execute(
-            '''
-            INSERT INTO trades (
-                symbol, timeframe, signal_type, entry_price, stop_loss, take_profit,
-                position_size, risk_amount, profit_potential, capital_before, capital_after, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-        , (
+        self._pending_trades.append((
             trade_signal['symbol'],
             trade_signal.get('timeframe', 'N/A'),
             trade_signal['signal_type'],
@@ -224,7 +314,17 @@ class TradingSystem:
             'OPEN',
         ))
 
-        self.db_connection.commit()
+    def flush_db(self):
+        """Write buffered signals and trades in a single transaction"""
+        if not self._pending_signals and not self._pending_trades:
+            return
+
+        with self.transaction() as cursor:
+            cursor.executemany(_INSERT_SIGNAL_SQL, self._pending_signals)
+            cursor.executemany(_INSERT_TRADE_SQL, self._pending_trades)
+
+        self._pending_signals.clear()
+        self._pending_trades.clear()
     
     async def send_daily_report(self):
         """Send daily performance report"""
@@ -247,28 +347,42 @@ class TradingSystem:
     def start(self):
         """Start the trading system"""
         try:
-            asyncio.run(self.run_trading_cycle())
+            if self.config.get('market_stream'):
+                asyncio.run(self.run_streaming_cycle())
+            else:
+                asyncio.run(self.run_trading_cycle())
         except KeyboardInterrupt:
             logger.info("Trading system stopped by user")
         except Exception as e:
-            logger.error(f"Fatal error in trading system: {e}")
-
-    def is_within_trading_hours(self) -> bool:
-        """Check if current time falls within configured trading hours"""
-        trading_hours = self.config.get('trading_hours')
+            logger.error("Fatal error in trading system: %s", e)
+        finally:
+            self.flush_db()
 
+    @staticmethod
+    def parse_trading_hours(trading_hours) -> Optional[List[Tuple[dt_time, dt_time]]]:
+        """Parse configured trading hours once; None means trading is always allowed"""
         if not trading_hours:
-            return True
-
-        now_time = datetime.now().time()
+            return None
 
+        windows = []
         for window in trading_hours:
             try:
                 start = datetime.strptime(window['start'], "%H:%M").time()
                 end = datetime.strptime(window['end'], "%H:%M").time()
             except (KeyError, ValueError):
                 continue
+            windows.append((start, end))
+
+        return windows
+
+    def is_within_trading_hours(self) -> bool:
+        """Check if current time falls within configured trading hours"""
+        if self._trading_windows is None:
+            return True
+
+        now_time = datetime.now().time()
 
+        for start, end in self._trading_windows:
             if start <= end:
                 if start <= now_time <= end:
                     return True
@@ -279,12 +393,15 @@ class TradingSystem:
         return False
 
 # Configuration
-CONFIG = {
+# Read-only: accidental writes raise TypeError
+CONFIG = MappingProxyType({
     'exchange': 'binance',
     'symbols': ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'],
     'timeframes': ['5m', '15m', '1h', '4h'],
     'timeframe': '1h',
-    'refresh_interval': 300,  # 5 minutes
+    'refresh_interval': 300,  # 5 minutes (polling mode only)
+    'market_stream': True,  # Binance kline websocket instead of polling
+    'max_concurrent_requests': None,  # None: follow the exchange rate limit (Binance: 20/s)
     'trading_hours': [
         {'start': '00:00', 'end': '23:59'},
     ],
@@ -293,7 +410,7 @@ CONFIG = {
     'max_risk_per_trade': 2.0,
     'telegram_bot_token': 'your_telegram_bot_token',
     'telegram_chat_id': 'your_telegram_chat_id'
-}
+})
 
 if __name__ == "__main__":
     trading_system = TradingSystem(CONFIG)
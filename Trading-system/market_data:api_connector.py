@@ -1,43 +1,166 @@
 import ccxt
-import pandas as pd
+import ccxt.async_support
+import numpy as np
 import time
 from datetime import datetime, timedelta
 import requests
 import logging
+from typing import Dict, List, Optional, Tuple
 
 class MarketAPI:
+    _ccxt = ccxt
+
     def __init__(self, exchange_name='binance'):
-        self.exchange = getattr(ccxt, exchange_name)({
+        self.exchange = getattr(self._ccxt, exchange_name)({
             'enableRateLimit': True,
             'options': {
                 'adjustForTimeDifference': True
             }
         })
         self.logger = logging.getLogger(__name__)
+        # SoA cache per (symbol, timeframe): int64 'timestamp' (ms) and float64 'ohlcv' of shape (n, 5)
+        self._ohlcv_cache: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
     
-    def get_ohlcv(self, symbol, timeframe='1h', limit=1000):
-        """Obtener datos OHLCV"""
+    def get_ohlcv_arrays(self, symbol, timeframe='1h', limit=1000, refresh=True) -> Dict[str, np.ndarray]:
+        """Obtener datos OHLCV como arrays (solo se descargan las velas nuevas desde la ultima llamada)"""
+        key = (symbol, timeframe)
+
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            cached, since = self._plan_fetch(key, limit, refresh)
+            if cached is None:
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+                cached = self._after_fetch(key, limit, since, ohlcv)
+            if cached is None:
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                cached = self._after_fetch(key, limit, None, ohlcv)
+            return cached
         except Exception as e:
-            self.logger.error(f"Error fetching OHLCV data: {e}")
-            return pd.DataFrame()
+            self.logger.error("Error fetching OHLCV data: %s", e)
+            return {}
+
+    def requests_per_second(self) -> int:
+        """Peticiones por segundo que permite el limitador de ccxt (rateLimit en ms por peticion)"""
+        return max(1, int(1000 / self.exchange.rateLimit))
+
+    def add_candle(self, symbol, timeframe, candle) -> bool:
+        """Merge a streamed candle into the cache; False if it does not follow the cached candles"""
+        key = (symbol, timeframe)
+        cached = self._ohlcv_cache.get(key)
+        if cached is None or not len(cached['timestamp']):
+            return False
+
+        if candle[0] > cached['timestamp'][-1] + self.exchange.parse_timeframe(timeframe) * 1000:
+            return False
+
+        self._merge_ohlcv(key, [candle], incremental=True)
+        return True
+
+    def _plan_fetch(self, key: Tuple[str, str], limit: int, refresh: bool) -> Tuple[Optional[Dict[str, np.ndarray]], Optional[int]]:
+        """(cached arrays to return without fetching, or None; timestamp to fetch from, None for a full download)"""
+        if not refresh and self._has_cached_ohlcv(key, limit):
+            return self._cached_ohlcv(key, limit), None
+        return None, self._ohlcv_since(key, limit)
+
+    def _after_fetch(self, key: Tuple[str, str], limit: int, since: Optional[int], ohlcv: List[list]) -> Optional[Dict[str, np.ndarray]]:
+        """Merge fetched candles and return the cached arrays; None if a full download is needed instead"""
+        # A full page means we fell too far behind to stitch the gap
+        if since is not None and len(ohlcv) >= limit:
+            return None
+        self._merge_ohlcv(key, ohlcv, incremental=since is not None)
+        return self._cached_ohlcv(key, limit)
+
+    def _has_cached_ohlcv(self, key: Tuple[str, str], limit: int) -> bool:
+        cached = self._ohlcv_cache.get(key)
+        return cached is not None and len(cached['timestamp']) >= limit
+
+    def _cached_ohlcv(self, key: Tuple[str, str], limit: int) -> Dict[str, np.ndarray]:
+        # Views into the cache; _merge_ohlcv always builds new arrays, so they stay valid
+        cached = self._ohlcv_cache[key]
+        if not len(cached['timestamp']):
+            return {}
+        return {'timestamp': cached['timestamp'][-limit:], 'ohlcv': cached['ohlcv'][-limit:]}
+
+    def _ohlcv_since(self, key: Tuple[str, str], limit: int) -> Optional[int]:
+        """Timestamp (ms) to fetch from, or None when a full download is needed"""
+        if not self._has_cached_ohlcv(key, limit):
+            return None
+        # The last cached candle may still have been forming, so fetch from it onwards
+        return int(self._ohlcv_cache[key]['timestamp'][-1])
+
+    def _merge_ohlcv(self, key: Tuple[str, str], ohlcv: List[list], incremental: bool):
+        """Merge fetched candles into the cache (replacing it unless incremental)"""
+        cached = self._ohlcv_cache.get(key) if incremental else None
+        if cached is not None and not ohlcv:
+            return
+
+        timestamps = np.array([candle[0] for candle in ohlcv], dtype=np.int64)
+        values = np.array([candle[1:6] for candle in ohlcv], dtype=np.float64).reshape(-1, 5)
+
+        if cached is not None:
+            # Fetched candles replace cached ones with the same timestamp
+            size = len(cached['timestamp'])
+            keep = ~np.isin(cached['timestamp'], timestamps)
+            timestamps = np.concatenate([cached['timestamp'][keep], timestamps])
+            values = np.concatenate([cached['ohlcv'][keep], values])
+
+            # A streamed candle can be older than the newest cached (still forming) one
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order][-size:]
+            values = values[order][-size:]
+
+        self._ohlcv_cache[key] = {'timestamp': timestamps, 'ohlcv': values}
     
-    def get_ticker(self, symbol):
-        """Obtener ticker actual"""
+    def _request(self, method, *args):
+        """Llamar al exchange registrando el error (devuelve {} si falla)"""
         try:
-            return self.exchange.fetch_ticker(symbol)
+            return getattr(self.exchange, method)(*args)
         except Exception as e:
-            self.logger.error(f"Error fetching ticker: {e}")
+            self.logger.error("Error fetching %s: %s", method[len('fetch_'):], e)
             return {}
-    
+
+    def get_ticker(self, symbol):
+        """Obtener ticker actual"""
+        return self._request('fetch_ticker', symbol)
+
+    def get_tickers(self, symbols):
+        """Obtener los tickers de varios simbolos en una sola peticion"""
+        return self._request('fetch_tickers', symbols)
+
     def get_balance(self):
         """Obtener balance de la cuenta (si se tiene API key)"""
+        return self._request('fetch_balance')
+
+
+class AsyncMarketAPI(MarketAPI):
+    """MarketAPI sobre ccxt.async_support, para usar dentro del event loop"""
+    _ccxt = ccxt.async_support
+
+    async def get_ohlcv_arrays(self, symbol, timeframe='1h', limit=1000, refresh=True) -> Dict[str, np.ndarray]:
+        """Obtener datos OHLCV como arrays (solo se descargan las velas nuevas desde la ultima llamada)"""
+        key = (symbol, timeframe)
+
         try:
-            return self.exchange.fetch_balance()
+            cached, since = self._plan_fetch(key, limit, refresh)
+            if cached is None:
+                ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+                cached = self._after_fetch(key, limit, since, ohlcv)
+            if cached is None:
+                ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                cached = self._after_fetch(key, limit, None, ohlcv)
+            return cached
         except Exception as e:
-            self.logger.error(f"Error fetching balance: {e}")
-            return {}
\ No newline at end of file
+            self.logger.error("Error fetching OHLCV data: %s", e)
+            return {}
+
+    async def _request(self, method, *args):
+        """Llamar al exchange registrando el error (devuelve {} si falla)"""
+        # get_ticker/get_tickers/get_balance return this coroutine, so they are awaited as before
+        try:
+            return await getattr(self.exchange, method)(*args)
+        except Exception as e:
+            self.logger.error("Error fetching %s: %s", method[len('fetch_'):], e)
+            return {}
+
+    async def close(self):
+        """Cerrar la sesion HTTP del exchange"""
+        await self.exchange.close()
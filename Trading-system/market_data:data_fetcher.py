@@ -1,91 +1,123 @@
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
-from .api_connector import MarketAPI
-from .indicators import TechnicalIndicators
+from typing import Dict, List, Tuple
+from .api_connector import AsyncMarketAPI
+from .indicators import IndicatorState, TechnicalIndicators
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
 
 class DataFetcher:
-    def __init__(self, api_connector: MarketAPI):
+    def __init__(self, api_connector: AsyncMarketAPI):
         self.api = api_connector
         self.indicators = TechnicalIndicators()
+        # Per (symbol, timeframe): streaming state and the analyzed columns up to the last committed bar
+        self._states: Dict[Tuple[str, str], IndicatorState] = {}
+        self._frames: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
     
-    def fetch_and_analyze(self, symbol: str, timeframe: str = '1h', lookback: int = 1000) -> Dict:
-        """Fetch data and calculate all indicators"""
+    async def fetch_and_analyze(self, symbol: str, timeframe: str = '1h', lookback: int = 1000, refresh: bool = True) -> Dict:
+        """Fetch data and calculate all indicators (refresh=False reuses cached candles when available)
+
+        Returns one NumPy array per column ('timestamp' in ms, OHLCV and indicators),
+        plus the 'symbol' and 'timeframe' strings; empty if no data was received.
+        """
         # Get OHLCV data
-        df = self.api.get_ohlcv(symbol, timeframe, lookback)
+        data = await self.api.get_ohlcv_arrays(symbol, timeframe, lookback, refresh=refresh)
 
-        if df.empty:
+        if not data:
             return {}
 
-        df['symbol'] = symbol
-        df['timeframe'] = timeframe
-        
-        # Calculate technical indicators
-        df['ema21'] = self.indicators.ema(df['close'], 21)
-        df['ema50'] = self.indicators.ema(df['close'], 50)
-        df['ema200'] = self.indicators.ema(df['close'], 200)
-        df['rsi'] = self.indicators.rsi(df['close'], 14)
-        df['atr'] = self.indicators.atr(df['high'], df['low'], df['close'], 14)
-        df['sma_volume'] = self.indicators.sma(df['volume'], 20)
-        
-        # Calculate Bollinger Bands
-        bb_upper, bb_middle, bb_lower = self.indicators.bollinger_bands(df['close'], 20, 2)
-        df['bb_upper'] = bb_upper
-        df['bb_middle'] = bb_middle
-        df['bb_lower'] = bb_lower
-        
-        # Calculate MACD
-        macd_line, signal_line, histogram = self.indicators.macd(df['close'])
-        df['macd'] = macd_line
-        df['macd_signal'] = signal_line
-        df['macd_histogram'] = histogram
-        
-        # Calculate additional metrics
-        df['volume_ratio'] = df['volume'] / df['sma_volume']
-        df['price_change'] = df['close'].pct_change()
-        df['volatility'] = df['close'].rolling(20).std()
-        
-        return df.to_dict('records')
-    
-    def detect_candlestick_patterns(self, df: pd.DataFrame) -> Dict:
+        key = (symbol, timeframe)
+        state = self._states.get(key)
+
+        if state is not None and (data['timestamp'] == state.last_timestamp).any():
+            start = np.searchsorted(data['timestamp'], state.last_timestamp, side='right')
+        else:
+            # Cold start (or a gap in the cached candles): walk the whole history from a fresh state
+            self._states[key] = IndicatorState()
+            self._frames.pop(key, None)
+            start = 0
+
+        columns = self._analyze_new_bars(key, data, start, lookback)
+        return {**columns, 'symbol': symbol, 'timeframe': timeframe}
+
+    def _analyze_new_bars(self, key: Tuple[str, str], data: Dict[str, np.ndarray], start: int, lookback: int) -> Dict[str, np.ndarray]:
+        """Update indicators only for candles from `start` on, i.e. newer than the last committed one"""
+        state = self._states[key]
+        committed = self._frames.get(key)
+
+        if start == len(data['timestamp']):
+            return {name: values[-lookback:] for name, values in committed.items()}
+
+        timestamps = data['timestamp'][start:]
+        ohlcv = data['ohlcv'][start:]
+        new_columns = {'timestamp': timestamps, **dict(zip(OHLCV_COLUMNS, ohlcv.T))}
+
+        # The last candle is usually still forming: commit the ones before it and
+        # preview it on a copy of the state so it is recomputed once it closes
+        values = self.indicators.update_streaming(state, timestamps[:-1], ohlcv[:-1])
+        preview = self.indicators.update_streaming(state.copy(), timestamps[-1:], ohlcv[-1:])
+        for name in values:
+            new_columns[name] = np.concatenate([values[name], preview[name]])
+
+        if committed is None:
+            committed = {name: column[:-1] for name, column in new_columns.items()}
+        else:
+            committed = {
+                name: np.concatenate([committed[name], new_columns[name][:-1]])[-lookback:]
+                for name in committed
+            }
+        self._frames[key] = committed
+
+        return {
+            name: np.concatenate([committed[name], new_columns[name][-1:]])[-lookback:]
+            for name in committed
+        }
+
+    def detect_candlestick_patterns(self, data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Detect candlestick patterns"""
         patterns = {}
+        o, h, l, c = (data[name] for name in ('open', 'high', 'low', 'close'))
         
-        # Calculate candle properties
-        df['body'] = abs(df['close'] - df['open'])
-        df['upper_shadow'] = df['high'] - df['close'].where(df['close'] > df['open'], df['open'])
-        df['lower_shadow'] = df['close'].where(df['close'] < df['open'], df['open']) - df['low']
-        df['total_range'] = df['high'] - df['low']
+        # Calculate candle properties into preallocated buffers
+        n = len(c)
+        body = np.empty(n)
+        upper_shadow = np.empty(n)
+        lower_shadow = np.empty(n)
+        np.subtract(c, o, out=body)
+        np.abs(body, out=body)
+        np.maximum(c, o, out=upper_shadow)
+        np.subtract(h, upper_shadow, out=upper_shadow)
+        np.minimum(c, o, out=lower_shadow)
+        np.subtract(lower_shadow, l, out=lower_shadow)
+        green = c > o
+        red = c < o
         
         # Hammer pattern
-        patterns['hammer'] = (
-            (df['lower_shadow'] >= 2 * df['body']) & 
-            (df['upper_shadow'] <= df['body']) & 
-            (df['close'] > df['open'])
-        )
+        patterns['hammer'] = np.logical_and.reduce((lower_shadow >= 2 * body, upper_shadow <= body, green))
         
         # Shooting star pattern
-        patterns['shooting_star'] = (
-            (df['upper_shadow'] >= 2 * df['body']) & 
-            (df['lower_shadow'] <= df['body']) & 
-            (df['close'] < df['open'])
-        )
+        patterns['shooting_star'] = np.logical_and.reduce((upper_shadow >= 2 * body, lower_shadow <= body, red))
+        
+        # Engulfing patterns compare each candle with the previous one; the first candle has none
+        prev_o, prev_c = o[:-1], c[:-1]
+        cur_o, cur_c = o[1:], c[1:]
         
         # Bullish engulfing
-        patterns['bullish_engulfing'] = (
-            (df['open'].shift(1) > df['close'].shift(1)) &  # Previous candle red
-            (df['close'] > df['open']) &  # Current candle green
-            (df['open'] < df['close'].shift(1)) &  # Current open below previous close
-            (df['close'] > df['open'].shift(1))  # Current close above previous open
-        )
+        patterns['bullish_engulfing'] = np.zeros(n, dtype=bool)
+        np.logical_and.reduce((
+            prev_o > prev_c,  # Previous candle red
+            green[1:],  # Current candle green
+            cur_o < prev_c,  # Current open below previous close
+            cur_c > prev_o,  # Current close above previous open
+        ), out=patterns['bullish_engulfing'][1:])
         
         # Bearish engulfing
-        patterns['bearish_engulfing'] = (
-            (df['close'].shift(1) > df['open'].shift(1)) &  # Previous candle green
-            (df['open'] > df['close']) &  # Current candle red
-            (df['close'] < df['open'].shift(1)) &  # Current close below previous open
-            (df['open'] > df['close'].shift(1))  # Current open above previous close
-        )
+        patterns['bearish_engulfing'] = np.zeros(n, dtype=bool)
+        np.logical_and.reduce((
+            prev_c > prev_o,  # Previous candle green
+            red[1:],  # Current candle red
+            cur_c < prev_o,  # Current close below previous open
+            cur_o > prev_c,  # Current open above previous close
+        ), out=patterns['bearish_engulfing'][1:])
         
-        return patterns
\ No newline at end of file
+        return patterns
@@ -0,0 +1,146 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Scalar state vector layout
+PREV_CLOSE, EMA21, EMA50, EMA200, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BAR_COUNT = range(8)
+STATE_SIZE = 8
+
+# Rolling window buffer rows; each row is a ring buffer indexed by BAR_COUNT % period
+GAINS, LOSSES, TRUE_RANGES, CLOSES, VOLUMES = range(5)
+WINDOW_ROWS = 5
+WINDOW_SIZE = 20
+
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BB_PERIOD = 20
+VOLUME_PERIOD = 20
+
+# Columns produced by update_bars, in order
+OUTPUT_COLUMNS = (
+    'ema21', 'ema50', 'ema200', 'rsi', 'atr', 'sma_volume',
+    'bb_upper', 'bb_middle', 'bb_lower', 'macd', 'macd_signal', 'macd_histogram',
+    'volume_ratio', 'price_change', 'volatility',
+)
+
+
+def new_state() -> np.ndarray:
+    state = np.full(STATE_SIZE, np.nan)
+    state[BAR_COUNT] = 0.0
+    return state
+
+
+def new_windows() -> np.ndarray:
+    return np.zeros((WINDOW_ROWS, WINDOW_SIZE))
+
+
+@njit(cache=True)
+def _ema_step(prev, value, period, first):
+    if first:
+        return value
+    alpha = 2.0 / (period + 1)
+    return alpha * value + (1.0 - alpha) * prev
+
+
+@njit(cache=True)
+def _window_mean(windows, row, period, count):
+    """Mean of the last `period` values pushed into a window row (NaN until it is full)"""
+    if count < period:
+        return np.nan
+    total = 0.0
+    for k in range(period):
+        total += windows[row, k]
+    return total / period
+
+
+@njit(cache=True)
+def update_bars(state, windows, ohlcv):
+    """Advance the indicator state over the given (m, 5) OHLCV bars, returning an (m, 15) array
+
+    `state` and `windows` are updated in place. EMAs/MACD use the usual recursion; RSI, ATR,
+    Bollinger and the volume SMA are rolling means over ring buffers, matching the
+    full-series definitions in TechnicalIndicators.
+    """
+    m = ohlcv.shape[0]
+    out = np.empty((m, len(OUTPUT_COLUMNS)))
+
+    for i in range(m):
+        high = ohlcv[i, 1]
+        low = ohlcv[i, 2]
+        close = ohlcv[i, 3]
+        volume = ohlcv[i, 4]
+
+        count = int(state[BAR_COUNT])
+        first = count == 0
+        prev_close = state[PREV_CLOSE]
+
+        state[EMA21] = _ema_step(state[EMA21], close, 21, first)
+        state[EMA50] = _ema_step(state[EMA50], close, 50, first)
+        state[EMA200] = _ema_step(state[EMA200], close, 200, first)
+        state[MACD_FAST] = _ema_step(state[MACD_FAST], close, 12, first)
+        state[MACD_SLOW] = _ema_step(state[MACD_SLOW], close, 26, first)
+        macd_line = state[MACD_FAST] - state[MACD_SLOW]
+        state[MACD_SIGNAL] = _ema_step(state[MACD_SIGNAL], macd_line, 9, first)
+
+        if first:
+            delta = 0.0
+            true_range = high - low
+        else:
+            delta = close - prev_close
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        windows[GAINS, count % RSI_PERIOD] = delta if delta > 0 else 0.0
+        windows[LOSSES, count % RSI_PERIOD] = -delta if delta < 0 else 0.0
+        windows[TRUE_RANGES, count % ATR_PERIOD] = true_range
+        windows[CLOSES, count % BB_PERIOD] = close
+        windows[VOLUMES, count % VOLUME_PERIOD] = volume
+        count += 1
+
+        avg_gain = _window_mean(windows, GAINS, RSI_PERIOD, count)
+        avg_loss = _window_mean(windows, LOSSES, RSI_PERIOD, count)
+        if avg_loss > 0:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            rsi = 100.0
+        else:
+            rsi = np.nan
+
+        atr = _window_mean(windows, TRUE_RANGES, ATR_PERIOD, count)
+        sma_volume = _window_mean(windows, VOLUMES, VOLUME_PERIOD, count)
+
+        bb_middle = _window_mean(windows, CLOSES, BB_PERIOD, count)
+        if count >= BB_PERIOD:
+            squares = 0.0
+            for k in range(BB_PERIOD):
+                squares += (windows[CLOSES, k] - bb_middle) ** 2
+            std = math.sqrt(squares / (BB_PERIOD - 1))
+        else:
+            std = np.nan
+
+        out[i, 0] = state[EMA21]
+        out[i, 1] = state[EMA50]
+        out[i, 2] = state[EMA200]
+        out[i, 3] = rsi
+        out[i, 4] = atr
+        out[i, 5] = sma_volume
+        out[i, 6] = bb_middle + std * 2
+        out[i, 7] = bb_middle
+        out[i, 8] = bb_middle - std * 2
+        out[i, 9] = macd_line
+        out[i, 10] = state[MACD_SIGNAL]
+        out[i, 11] = macd_line - state[MACD_SIGNAL]
+        out[i, 12] = volume / sma_volume if sma_volume != 0 else np.nan
+        out[i, 13] = np.nan if first else close / prev_close - 1
+        out[i, 14] = std
+
+        state[PREV_CLOSE] = close
+        state[BAR_COUNT] = count
+
+    return out
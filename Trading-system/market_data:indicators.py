@@ -1,55 +1,94 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .indicator_kernels import OUTPUT_COLUMNS, new_state, new_windows, update_bars
+
+
+@dataclass
+class IndicatorState:
+    """Running indicator state for one (symbol, timeframe) stream, as of the last committed bar"""
+    last_timestamp: Optional[int] = None  # ms
+    values: np.ndarray = field(default_factory=new_state)  # EMAs, previous close, bar count
+    windows: np.ndarray = field(default_factory=new_windows)  # rolling windows (ring buffers)
+
+    def copy(self) -> 'IndicatorState':
+        return IndicatorState(self.last_timestamp, self.values.copy(), self.windows.copy())
+
+
+def _diff(data: np.ndarray) -> np.ndarray:
+    """First difference, NaN for the first element (like Series.diff())"""
+    return np.diff(data, prepend=np.nan)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    # fmax ignores the missing previous close on the first bar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
 
 class TechnicalIndicators:
     @staticmethod
-    def ema(data: pd.Series, period: int) -> pd.Series:
+    def ema(data: np.ndarray, period: int) -> np.ndarray:
         """Exponential Moving Average"""
-        return data.ewm(span=period, adjust=False).mean()
+        return pd.Series(data).ewm(span=period, adjust=False).mean().to_numpy()
     
     @staticmethod
-    def sma(data: pd.Series, period: int) -> pd.Series:
+    def sma(data: np.ndarray, period: int) -> np.ndarray:
         """Simple Moving Average"""
-        return data.rolling(window=period).mean()
-    
+        return pd.Series(data).rolling(window=period).mean().to_numpy()
+
     @staticmethod
-    def rsi(data: pd.Series, period: int = 14) -> pd.Series:
+    def std(data: np.ndarray, period: int) -> np.ndarray:
+        """Rolling sample standard deviation"""
+        return pd.Series(data).rolling(window=period).std().to_numpy()
+    
+    @classmethod
+    def rsi(cls, data: np.ndarray, period: int = 14) -> np.ndarray:
         """Relative Strength Index"""
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
+        delta = _diff(data)
+        gain = cls.sma(np.where(delta > 0, delta, 0.0), period)
+        loss = cls.sma(np.where(delta < 0, -delta, 0.0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
         return 100 - (100 / (1 + rs))
     
-    @staticmethod
-    def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    @classmethod
+    def atr(cls, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
         """Average True Range"""
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean()
+        return cls.sma(_true_range(high, low, close), period)
     
-    @staticmethod
-    def bollinger_bands(data: pd.Series, period: int = 20, std_dev: int = 2) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    @classmethod
+    def bollinger_bands(cls, data: np.ndarray, period: int = 20, std_dev: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Bollinger Bands"""
-        sma = data.rolling(window=period).mean()
-        std = data.rolling(window=period).std()
+        sma = cls.sma(data, period)
+        std = cls.std(data, period)
         upper_band = sma + (std * std_dev)
         lower_band = sma - (std * std_dev)
         return upper_band, sma, lower_band
     
-    @staticmethod
-    def macd(data: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    @classmethod
+    def macd(cls, data: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """MACD"""
-        ema_fast = data.ewm(span=fast, adjust=False).mean()
-        ema_slow = data.ewm(span=slow, adjust=False).mean()
+        ema_fast = cls.ema(data, fast)
+        ema_slow = cls.ema(data, slow)
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        signal_line = cls.ema(macd_line, signal)
         histogram = macd_line - signal_line
         return macd_line, signal_line, histogram
-    
+
+    @staticmethod
+    def update_streaming(state: IndicatorState, timestamps: np.ndarray, ohlcv: np.ndarray) -> Dict[str, np.ndarray]:
+        """Advance the indicator state over new (n, 5) OHLCV bars and return their indicator columns
+
+        Starting from a fresh IndicatorState this computes the full series (cold start);
+        each bar costs O(1) regardless of how much history came before it.
+        """
+        values = update_bars(state.values, state.windows, np.ascontiguousarray(ohlcv, dtype=np.float64))
+        if len(timestamps):
+            state.last_timestamp = int(timestamps[-1])
+        return dict(zip(OUTPUT_COLUMNS, values.T))
+
     @staticmethod
     def fibonacci_levels(high: float, low: float, trend: str) -> Dict[str, float]:
         """Calculate Fibonacci levels"""
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Tuple
+
+import websockets
+
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/stream?streams='
+
+
+class MarketStream:
+    """Velas cerradas en tiempo real desde los kline streams de Binance"""
+
+    def __init__(self, symbols: List[str], timeframes: List[str], url: str = BINANCE_STREAM_URL, reconnect_delay: int = 5):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        # Stream name -> (symbol, timeframe), e.g. 'btcusdt@kline_5m' -> ('BTC/USDT', '5m')
+        self._streams: Dict[str, Tuple[str, str]] = {
+            f"{symbol.replace('/', '').lower()}@kline_{timeframe}": (symbol, timeframe)
+            for symbol in symbols
+            for timeframe in timeframes
+        }
+        # (symbol, timeframe, [timestamp, open, high, low, close, volume]) per closed candle
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self):
+        """Mantener la conexion abierta y encolar cada vela cerrada"""
+        url = self.url + '/'.join(self._streams)
+
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=20) as websocket:
+                    self.logger.info("Connected to market stream (%s streams)", len(self._streams))
+                    async for message in websocket:
+                        self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Market stream error: %s", e)
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _handle_message(self, message):
+        payload = json.loads(message)
+        kline = payload.get('data', {}).get('k')
+
+        # Only act on finalized candles; intermediate updates are ignored
+        if not kline or not kline.get('x'):
+            return
+
+        key = self._streams.get(payload.get('stream'))
+        if key is None:
+            return
+
+        candle = [
+            kline['t'],
+            float(kline['o']),
+            float(kline['h']),
+            float(kline['l']),
+            float(kline['c']),
+            float(kline['v']),
+        ]
+        self.queue.put_nowait((*key, candle))
@@ -1,33 +1,205 @@
-from flask import Flask, render_template, jsonify, request
-import random
+from flask import Flask, Response, render_template, make_response, request, stream_with_context
 from datetime import datetime, timedelta, date
+from functools import lru_cache, wraps
+import atexit
 import json
+import numpy as np
+import orjson
 import sqlite3
+import threading
+import time
+from types import MappingProxyType
 
 from market_data.api_connector import MarketAPI
 from main_trading_system import CONFIG
 
 app = Flask(__name__)
 
+# Dashboard polling endpoints are served from memory for this many seconds
+RESPONSE_TTL = 1
+
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+# Market data payload with no candles
+EMPTY_CANDLES = MappingProxyType({'t': [], 'o': [], 'h': [], 'l': [], 'c': [], 'v': []})
+
+# Columns the dashboard reads from each table
+SIGNAL_COLUMNS = 'id, timestamp, symbol, timeframe, signal_type, entry_price, stop_loss, take_profit'
+TRADE_COLUMNS = (
+    'id, timestamp, symbol, timeframe, signal_type, entry_price, stop_loss, take_profit, '
+    'position_size, profit_potential, status'
+)
+
+
+# One SQLite connection per server thread, reused across requests
+_db_local = threading.local()
+_db_connections = []
+_db_connections_lock = threading.Lock()
+
 
 # --- Helpers ---
 def get_db_connection():
-    conn = sqlite3.connect('trading_system.db')
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect('trading_system.db', check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        _db_local.conn = conn
+        with _db_connections_lock:
+            _db_connections.append(conn)
     return conn
 
 
-def serialize_row(row):
-    return {key: row[key] for key in row.keys()}
+@atexit.register
+def close_db_connections():
+    with _db_connections_lock:
+        for conn in _db_connections:
+            conn.close()
+        _db_connections.clear()
+
+
+def ojson(data):
+    """JSON response serialized with orjson (NumPy arrays and scalars are passed through as-is)"""
+    # Anything orjson has no native encoding for (e.g. Decimal) falls back to str()
+    return Response(orjson.dumps(data, default=str, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
+
+
+def stream_rows(cursor):
+    """Stream the rows of the last query as a JSON array of objects, serializing one row at a time"""
+    keys = tuple(column[0] for column in cursor.description)
+
+    def generate():
+        yield b'['
+        for index, row in enumerate(cursor):
+            if index:
+                yield b','
+            yield orjson.dumps(dict(zip(keys, row)), default=str)
+        yield b']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def balance_timestamps(days):
+    """ISO timestamps for now and each of the previous days, newest first"""
+    now = np.datetime64(datetime.now(), 'us')
+    return np.datetime_as_string(now - np.arange(days) * np.timedelta64(1, 'D')).tolist()
+
+
+def fetch_dicts(cursor):
+    """Rows of the last query as dicts, keyed by the column names captured once from the cursor"""
+    keys = tuple(column[0] for column in cursor.description)
+    return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+
+# Built once from the (read-only) CONFIG; entries are read-only too
+_FALLBACK_SYMBOLS = tuple(
+    MappingProxyType({'symbol': s, 'name': s, 'timeframe': CONFIG.get('timeframe', '1h')})
+    for s in CONFIG.get('symbols', ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])
+)
 
 
 def fallback_symbols():
-    symbols = CONFIG.get('symbols', ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])
-    return [{'symbol': s, 'name': s, 'timeframe': CONFIG.get('timeframe', '1h')} for s in symbols]
+    return _FALLBACK_SYMBOLS
+
+
+def cached_response(view):
+    """Serve repeated requests within the same second from memory"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        bucket = int(time.time()) // RESPONSE_TTL
+        key = (request.path, request.query_string, bucket)
+
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+
+        if cached is None:
+            response = make_response(view(*args, **kwargs))
+            cached = (response.get_data(), response.status_code, response.mimetype)
+            with _response_cache_lock:
+                # Only the current bucket is ever served, so drop older entries
+                for stale_key in [k for k in _response_cache if k[2] != bucket]:
+                    del _response_cache[stale_key]
+                _response_cache[key] = cached
+
+        data, status, mimetype = cached
+        return Response(data, status=status, mimetype=mimetype)
+
+    return wrapper
 
 
 market_api = MarketAPI(CONFIG.get('exchange', 'binance'))
 
+# Tickers are shared by all endpoints for this many seconds
+TICKER_TTL = 2
+
+_ticker_cache = {}
+_ticker_cache_lock = threading.Lock()
+
+
+def get_cached_tickers(symbols):
+    """Tickers by symbol, each fetched from the exchange at most once every TICKER_TTL seconds
+
+    Symbols missing from the cache are fetched together in a single request.
+    """
+    now = time.monotonic()
+    tickers = {}
+    with _ticker_cache_lock:
+        for symbol in symbols:
+            cached = _ticker_cache.get(symbol)
+            if cached is not None and now - cached[0] < TICKER_TTL:
+                tickers[symbol] = cached[1]
+
+    missing = [symbol for symbol in symbols if symbol not in tickers]
+    if missing:
+        fetched = market_api.get_tickers(missing)
+        with _ticker_cache_lock:
+            for symbol in missing:
+                ticker = fetched.get(symbol)
+                if ticker:
+                    _ticker_cache[symbol] = (now, ticker)
+                    tickers[symbol] = ticker
+
+    return tickers
+
+
+def get_cached_ticker(symbol):
+    return get_cached_tickers([symbol]).get(symbol, {})
+
+
+@lru_cache(maxsize=256)
+def market_data_payload(symbol, timeframe, bucket):
+    """Serialized candles for a symbol as {'t', 'o', 'h', 'l', 'c', 'v'} columns
+
+    `bucket` (the current candle period) expires the entry.
+    """
+    data = market_api.get_ohlcv_arrays(symbol, timeframe=timeframe, limit=150)
+
+    if not data:
+        # Raising keeps failed fetches out of the cache
+        raise LookupError(f"No OHLCV data for {symbol} {timeframe}")
+
+    # Columnar payload: each price column is serialized straight from a contiguous float64 buffer
+    open_, high, low, close, volume = np.ascontiguousarray(data['ohlcv'].T, dtype=np.float64)
+    times = np.datetime_as_string(data['timestamp'].astype('datetime64[ms]'), unit='s').tolist()
+    return orjson.dumps(
+        {'t': times, 'o': open_, 'h': high, 'l': low, 'c': close, 'v': volume},
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+@app.after_request
+def add_cache_headers(response):
+    if request.method == 'GET' and request.path.startswith('/api/'):
+        response.cache_control.max_age = RESPONSE_TTL
+        # An ETag needs the whole body, so streamed responses go without one
+        if not response.is_streamed:
+            response.add_etag()
+            response.make_conditional(request)
+    return response
+
 
 @app.route('/')
 def index():
@@ -47,102 +219,104 @@ def terminal():
 @app.route('/api/market-data/<path:symbol>')
 def get_market_data(symbol):
     timeframe = request.args.get('timeframe', CONFIG.get('timeframe', '1h'))
-    df = market_api.get_ohlcv(symbol, timeframe=timeframe, limit=150)
-
-    if df.empty:
-        return jsonify([])
+    try:
+        # One cache entry per candle period: repeat polls within a bar reuse the payload
+        bucket = int(time.time() // market_api.exchange.parse_timeframe(timeframe))
+        payload = market_data_payload(symbol, timeframe, bucket)
+    except Exception:
+        # Unknown timeframe or no candles received
+        return ojson(dict(EMPTY_CANDLES))
 
-    data = [
-        {
-            'time': row.timestamp.isoformat(),
-            'open': float(row.open),
-            'high': float(row.high),
-            'low': float(row.low),
-            'close': float(row.close),
-            'volume': float(row.volume),
-        }
-        for row in df.itertuples()
-    ]
-    return jsonify(data)
+    return Response(payload, mimetype='application/json')
 
 
 @app.route('/api/portfolio-data')
+@cached_response
 def get_portfolio_data():
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    today = date.today().isoformat()
-    cursor.execute(
-        """
-        SELECT COUNT(*) as total_trades,
-               SUM(CASE WHEN signal_type = 'LONG' THEN 1 ELSE 0 END) as long_trades,
-               SUM(CASE WHEN signal_type = 'SHORT' THEN 1 ELSE 0 END) as short_trades
-        FROM signals
-        WHERE date(timestamp) = ?
-        """,
-        (today,),
-    )
-    trade_stats = cursor.fetchone() or {'total_trades': 0, 'long_trades': 0, 'short_trades': 0}
+    # Half-open range on the raw column so the timestamp indexes can be used
+    today = date.today()
+    day_range = (today.isoformat(), (today + timedelta(days=1)).isoformat())
 
-    cursor.execute(
-        """
-        SELECT * FROM trades
-        WHERE date(timestamp) = ?
-        ORDER BY timestamp DESC
-        LIMIT 50
-        """,
-        (today,),
-    )
-    todays_trades = [serialize_row(row) for row in cursor.fetchall()]
+    # All reads share one transaction: a single snapshot and lock acquisition
+    cursor.execute('BEGIN')
+    try:
+        cursor.execute(
+            """
+            SELECT COUNT(*) as total_trades,
+                   SUM(CASE WHEN signal_type = 'LONG' THEN 1 ELSE 0 END) as long_trades,
+                   SUM(CASE WHEN signal_type = 'SHORT' THEN 1 ELSE 0 END) as short_trades
+            FROM signals
+            WHERE timestamp >= ? AND timestamp < ?
+            """,
+            day_range,
+        )
+        total_trades, long_trades, short_trades = cursor.fetchone()
+
+        cursor.execute(
+            f"""
+            SELECT {TRADE_COLUMNS} FROM trades
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp DESC
+            LIMIT 50
+            """,
+            day_range,
+        )
+        todays_trades = fetch_dicts(cursor)
+
+        # Summed by SQLite over all of today's trades, not just the 50 listed
+        cursor.execute(
+            "SELECT COALESCE(SUM(profit_potential), 0) FROM trades WHERE timestamp >= ? AND timestamp < ?",
+            day_range,
+        )
+        realized_pnl = cursor.fetchone()[0]
+        positions = get_open_positions(cursor)
+    finally:
+        cursor.execute('COMMIT')
 
     # Balance simulated from risk manager baseline with today's PnL approximation
     base_capital = CONFIG.get('base_capital', 10000)
-    realized_pnl = sum((trade.get('profit_potential') or 0) for trade in todays_trades)
 
     portfolio = {
         'balance': base_capital + realized_pnl,
         'daily_pnl': realized_pnl,
         'win_rate': 0,
-        'total_trades': trade_stats['total_trades'] if isinstance(trade_stats, dict) else trade_stats[0],
+        'total_trades': total_trades,
         'balance_history': [
-            {'timestamp': (datetime.now() - timedelta(days=i)).isoformat(), 'balance': base_capital}
-            for i in range(30)
+            {'timestamp': timestamp, 'balance': base_capital}
+            for timestamp in balance_timestamps(30)
         ],
-        'positions': get_open_positions(conn),
+        'positions': positions,
         'trades': todays_trades,
     }
 
-    conn.close()
-    return jsonify(portfolio)
+    return ojson(portfolio)
 
 
-def get_open_positions(conn):
-    cursor = conn.cursor()
+def get_open_positions(cursor):
     cursor.execute(
         """
-        SELECT symbol, signal_type, entry_price, stop_loss, take_profit, position_size, risk_amount, timeframe, timestamp
+        SELECT symbol, signal_type, position_size, entry_price, timeframe, timestamp
         FROM trades
         WHERE status = 'OPEN'
         ORDER BY timestamp DESC
         LIMIT 20
         """
     )
-    rows = cursor.fetchall()
-    positions = []
-    for row in rows:
-        data = serialize_row(row)
-        positions.append(
-            {
-                'symbol': data.get('symbol'),
-                'type': data.get('signal_type'),
-                'size': data.get('position_size'),
-                'pnl': 0,
-                'entry': data.get('entry_price'),
-                'timeframe': data.get('timeframe'),
-                'opened_at': data.get('timestamp'),
-            }
-        )
-    return positions
+    return [
+        {
+            'symbol': symbol,
+            'type': signal_type,
+            'size': size,
+            'pnl': 0,
+            'entry': entry,
+            'timeframe': timeframe,
+            'opened_at': opened_at,
+        }
+        for symbol, signal_type, size, entry, timeframe, opened_at in cursor.fetchall()
+    ]
 
 
 @app.route('/api/real-time-data')
@@ -150,8 +324,8 @@ def get_real_time_data():
     symbols = fallback_symbols()
     symbol = symbols[0]['symbol']
     try:
-        ticker = market_api.get_ticker(symbol)
-        return jsonify(
+        ticker = get_cached_ticker(symbol)
+        return ojson(
             {
                 'timestamp': datetime.now().isoformat(),
                 'price': ticker.get('last') or ticker.get('close'),
@@ -162,7 +336,7 @@ def get_real_time_data():
             }
         )
     except Exception:
-        return jsonify(
+        return ojson(
             {
                 'timestamp': datetime.now().isoformat(),
                 'price': 0,
@@ -179,11 +353,9 @@ def get_signals():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
-        "SELECT * FROM signals ORDER BY timestamp DESC LIMIT 50"
+        f"SELECT {SIGNAL_COLUMNS} FROM signals ORDER BY timestamp DESC LIMIT 50"
     )
-    signals = [serialize_row(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(signals)
+    return stream_rows(cursor)
 
 
 @app.route('/api/trades')
@@ -191,21 +363,23 @@ def get_trades():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
-        "SELECT * FROM trades ORDER BY timestamp DESC LIMIT 50"
+        f"SELECT {TRADE_COLUMNS} FROM trades ORDER BY timestamp DESC LIMIT 50"
     )
-    trades = [serialize_row(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(trades)
+    return stream_rows(cursor)
 
 
 @app.route('/api/symbols')
+@cached_response
 def get_symbols():
     symbols = fallback_symbols()
     enriched_symbols = []
 
+    # One request for all symbols instead of one per symbol
+    tickers = get_cached_tickers([symbol['symbol'] for symbol in symbols])
+
     for symbol in symbols:
         try:
-            ticker = market_api.get_ticker(symbol['symbol'])
+            ticker = tickers.get(symbol['symbol'], {})
             enriched_symbols.append(
                 {
                     'symbol': symbol['symbol'],
@@ -218,8 +392,9 @@ def get_symbols():
         except Exception:
             enriched_symbols.append({**symbol, 'price': 0, 'change': 0})
 
-    return jsonify(enriched_symbols)
+    return ojson(enriched_symbols)
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development only; in production serve wsgi:application with gunicorn
+    app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""WSGI entry point for the dashboard
+
+Run from the repository root with a production server instead of the Flask dev server:
+
+    gunicorn -k gthread -w 2 --threads 8 -b 0.0.0.0:5000 --pythonpath professional_trading_system wsgi:application
+"""
+from app import app
+
+application = app
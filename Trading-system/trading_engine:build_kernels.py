@@ -0,0 +1,32 @@
+"""Ahead-of-time build of the signal kernel
+
+Compiles evaluate_bar into trading_engine/signal_kernels (a native extension next to this
+file), so processes import machine code instead of JIT-compiling it on first use.
+Run once per install (and again after editing signal_generator_kernel.py; an outdated
+build is ignored), from the repository root:
+
+    python -m trading_engine.build_kernels
+"""
+import os
+
+from numba.pycc import CC
+
+from trading_engine.signal_generator_kernel import evaluate_bar, source_hash
+
+cc = CC('signal_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+SOURCE_HASH = source_hash()
+
+
+@cc.export('source_hash', 'i8()')
+def _source_hash():
+    # Frozen at compile time; compared with the current source on import
+    return SOURCE_HASH
+
+
+# open, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume
+cc.export('evaluate_bar', 'UniTuple(f8, 6)(' + ', '.join(['f8[:]'] * 11) + ')')(evaluate_bar.py_func)
+
+if __name__ == '__main__':
+    cc.compile()
@@ -1,5 +1,4 @@
 from typing import Dict
-import math
 
 class RiskManager:
     def __init__(self, config: Dict):
@@ -24,10 +23,8 @@ class RiskManager:
         
         position_size = risk_amount / risk_per_unit
         
-        # Calculate profit potential
-        take_profit = self.calculate_take_profit(entry_price, stop_loss)
-        profit_per_unit = abs(take_profit - entry_price)
-        profit_potential = position_size * profit_per_unit
+        # Calculate profit potential: the 3:1 take profit sits 3 risk units from entry
+        profit_potential = position_size * risk_per_unit * 3
         
         return {
             'position_size': position_size,
@@ -39,7 +36,6 @@ class RiskManager:
     def calculate_take_profit(self, entry_price: float, stop_loss: float) -> float:
         """Calculate take profit based on 3:1 risk-reward ratio"""
         risk = abs(entry_price - stop_loss)
-        target_percent = self.config.get('daily_target', 5.0)
         
         if entry_price > stop_loss:  # Long trade
             return entry_price + (risk * 3)
@@ -0,0 +1,167 @@
+import hashlib
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+TREND_SIDEWAYS, TREND_BULLISH, TREND_BEARISH = 0, 1, 2
+TREND_NAMES = ('sideways', 'bullish', 'bearish')
+
+# Most candles any rule looks back over (liquidity levels use the last 20)
+SIGNAL_WINDOW = 20
+
+# Candles of history needed before signals are generated
+MIN_BARS = 50
+
+
+def source_hash() -> int:
+    """Hash of this file's source, stamped into the AOT build to detect stale extensions"""
+    with open(__file__, 'rb') as source:
+        return int.from_bytes(hashlib.sha256(source.read()).digest()[:7], 'big')
+
+
+@njit(cache=True)
+def _hammer(o, h, l, c):
+    total_range = h - l
+    body = abs(c - o)
+    lower_shadow = min(c, o) - l
+    return total_range > 0 and lower_shadow >= 0.6 * total_range and body >= 0.15 * total_range and c > o
+
+
+@njit(cache=True)
+def _shooting_star(o, h, l, c):
+    total_range = h - l
+    body = abs(c - o)
+    upper_shadow = h - max(c, o)
+    return total_range > 0 and upper_shadow >= 0.6 * total_range and body >= 0.15 * total_range and c < o
+
+
+@njit(cache=True)
+def _evaluate_at(open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume, i,
+                 recent_low, recent_high, low5, high5):
+    """Evaluate the signal rules on candle i, using it and the candles before it
+
+    recent_low/recent_high are the extremes of the 20 candles ending at i, low5/high5 those
+    of the five candles before i.
+    Returns (trend_code, long_signal, short_signal, entry_price, stop_loss, take_profit).
+    """
+    price = close[i]
+    current_atr = atr[i]
+
+    # Trend detection
+    if price > ema21[i] > ema50[i] > ema200[i]:
+        trend = TREND_BULLISH
+    elif price < ema21[i] < ema50[i] < ema200[i]:
+        trend = TREND_BEARISH
+    else:
+        trend = TREND_SIDEWAYS
+
+    # Cheapest filters first: most candles fail one of them and skip the setup rules below
+    long_signal = False
+    short_signal = False
+    if trend != TREND_SIDEWAYS and volume[i] > sma_volume[i] * 1.3 and 30 < rsi[i] < 70:
+        o = open_[i]
+        h = high[i]
+        l = low[i]
+        prev_o = open_[i - 1]
+        prev_c = close[i - 1]
+
+        if trend == TREND_BULLISH:
+            long_signal = (
+                # Liquidity sweep of the last 20 candles, or a Fair Value Gap against two bars ago
+                (h >= recent_high or (l > high[i - 2] and prev_c < prev_o))
+                and (
+                    (l <= low5 and price > low5)  # Order block against the five candles before
+                    or _hammer(o, h, l, price)
+                    or (prev_o > prev_c and price > o and o < prev_c and price > prev_o)  # Engulfing
+                )
+            )
+        else:
+            short_signal = (
+                (l <= recent_low or (h < low[i - 2] and prev_c > prev_o))
+                and (
+                    (h >= high5 and price < high5)
+                    or _shooting_star(o, h, l, price)
+                    or (prev_c > prev_o and o > price and price < prev_o and o > prev_c)
+                )
+            )
+
+    # Entry slightly past the price, stop 1.5 ATR away, take profit at 3:1 R:R
+    if long_signal:
+        entry = price - current_atr * 0.1
+        stop_loss = price - current_atr * 1.5
+    elif short_signal:
+        entry = price + current_atr * 0.1
+        stop_loss = price + current_atr * 1.5
+    else:
+        entry = price
+        stop_loss = price
+
+    risk = abs(entry - stop_loss)
+    if long_signal:
+        take_profit = entry + risk * 3
+    elif short_signal:
+        take_profit = entry - risk * 3
+    else:
+        take_profit = entry
+
+    return trend, long_signal, short_signal, entry, stop_loss, take_profit
+
+
+@njit(cache=True)
+def _evaluate_bar(open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume):
+    """Evaluate the signal rules on the last candle of the given arrays"""
+    return _evaluate_at(
+        open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume, len(close) - 1,
+        low[-20:].min(), high[-20:].max(), low[-6:-1].min(), high[-6:-1].max(),
+    )
+
+
+@njit(cache=True, parallel=True)
+def _evaluate_all_bars(open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume, start,
+                       recent_low, recent_high, low5, high5):
+    """Evaluate the signal rules on every candle from `start` on, in parallel across candles
+
+    recent_low/recent_high/low5/high5 hold the per-candle extremes described in _evaluate_at,
+    precomputed as rolling windows.
+    Returns int8 trend codes, boolean long/short signals and float64 entry/stop/take-profit
+    arrays; candles before `start` are left sideways, without signals and with NaN prices.
+    """
+    n = len(close)
+    trend = np.zeros(n, np.int8)
+    long_signal = np.zeros(n, np.bool_)
+    short_signal = np.zeros(n, np.bool_)
+    entry = np.full(n, np.nan)
+    stop_loss = np.full(n, np.nan)
+    take_profit = np.full(n, np.nan)
+
+    for i in prange(start, n):
+        result = _evaluate_at(
+            open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume, i,
+            recent_low[i], recent_high[i], low5[i], high5[i],
+        )
+        trend[i] = result[0]
+        long_signal[i] = result[1]
+        short_signal[i] = result[2]
+        entry[i] = result[3]
+        stop_loss[i] = result[4]
+        take_profit[i] = result[5]
+
+    return trend, long_signal, short_signal, entry, stop_loss, take_profit
+
+
+@njit(cache=True)
+def evaluate_bar(open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume):
+    """_evaluate_bar with every field as a float, the signature exported by build_kernels.py"""
+    trend, long_signal, short_signal, entry, stop_loss, take_profit = _evaluate_bar(
+        open_, high, low, close, volume, rsi, atr, ema21, ema50, ema200, sma_volume
+    )
+    return float(trend), 1.0 if long_signal else 0.0, 1.0 if short_signal else 0.0, entry, stop_loss, take_profit